@@ -10,16 +10,20 @@
   @date  2021-07-23
   @url  https://github.com/DFRobot/DFRobot_RS01
 '''
-import sys
 import time
+import array
+import select
+import struct
 import serial
+import threading
 
 import modbus_tk
 import modbus_tk.defines as cst
 from modbus_tk import modbus_rtu
+from modbus_tk.hooks import call_hooks
+from modbus_tk.modbus import ModbusInvalidResponseError
 
 import logging
-from ctypes import *
 
 
 logger = logging.getLogger()
@@ -87,6 +91,175 @@ RS01_COMPARISON_OFFSET          = 0x0016
 ## restore factory setting
 RS01_RESET_FACTORY             = 0x0017
 
+## the number of contiguous holding registers from RS01_PID_REG to RS01_COMPARISON_OFFSET
+RS01_ALL_REG_NUMBER            = 0x0017
+## validity period of the cached holding registers, unit second (50 ms covers one polling cycle)
+RS01_CACHE_TTL                 = 0.05
+## parser for the 23-register payload of the batched read, compiled once at import time
+_ALL_REG_STRUCT                = struct.Struct(">%dH" % RS01_ALL_REG_NUMBER)
+
+## the default measurement config: start position 200, stop position 6000,
+## initial threshold 400, end threshold 400, sensitivity 2, comparison offset 0
+_DEFAULT_CFG                   = (0x00C8, 0x1770, 0x0190, 0x0190, 0x0002, 0x0000)
+
+## baud rate in Hz to the E_BAUDRATE_* mode written to RS01_BAUDRATE_REG
+_BAUD_TABLE = {2400: 0x0001, 4800: 0x0002, 9600: 0x0003, 14400: 0x0004,
+               19200: 0x0005, 38400: 0x0006, 57600: 0x0007, 115200: 0x0008}
+
+
+def _set_low_latency(ser):
+    '''!
+      @brief Set the ASYNC_LOW_LATENCY flag on the serial port kernel driver
+      @details USB-UART bridges such as FTDI buffer received bytes for up to 16 ms by
+      @n       default, which dominates the turnaround of every small RTU transaction,
+      @n       the flag drops that latency to about 1 ms. Ignored silently on drivers
+      @n       that do not support the serial_struct ioctls.
+      @param ser the opened serial.Serial object
+    '''
+    try:
+        ser.set_low_latency_mode(True)
+    except (AttributeError, ValueError, IOError, OSError):
+        pass
+
+
+def _make_crc16_table():
+    '''!
+      @brief Compute the 256-entry CRC16-Modbus lookup table, once at import time
+      @return array: the lookup table indexed by (crc ^ byte) & 0xFF
+    '''
+    table = array.array('H')
+    for byte in range(256):
+        crc = byte
+        for _ in range(8):
+            crc = ((crc >> 1) ^ 0xA001) if (crc & 1) else (crc >> 1)
+        table.append(crc)
+    return table
+
+## CRC16-Modbus lookup table shared by every frame build and check
+_CRC16_TABLE = _make_crc16_table()
+
+
+def _calculate_crc16(data):
+    '''!
+      @brief Calculate the CRC16 of an RTU frame with one table lookup per byte
+      @details modbus_tk computes the same checksum but re-evaluates its table tuple
+      @n       inside every call, this keeps the table at module level instead
+      @param data the frame bytes to checksum
+      @return the CRC16, byte-swapped so that struct.pack('>H', crc) is wire order
+    '''
+    crc = 0xFFFF
+    for byte in data:
+        crc = (crc >> 8) ^ _CRC16_TABLE[(crc ^ byte) & 0xFF]
+    return ((crc & 0x00FF) << 8) | (crc >> 8)
+
+
+def _build_read_request(addr, reg, length):
+    '''!
+      @brief Pack a READ_HOLDING_REGISTERS request frame
+      @details The request bytes are constant for a given (addr, reg, length), so the
+      @n       hot read path packs its frame once here instead of re-encoding and
+      @n       re-checksumming the same 8 bytes on every poll inside modbus_tk
+      @param addr modbus communication address
+      @param reg starting register address
+      @param length the number of registers to read
+      @return bytes: the complete 8-byte request frame including CRC
+    '''
+    pdu = struct.pack(">BBHH", addr, cst.READ_HOLDING_REGISTERS, reg, length)
+    return pdu + struct.pack(">H", _calculate_crc16(pdu))
+
+
+def _rtu_frame_length(frame):
+    '''!
+      @brief Calculate the complete length of an RTU response frame
+      @param frame the bytes received so far, possibly incomplete
+      @return the complete frame length in bytes, or None if more bytes are needed to judge
+    '''
+    if len(frame) < 2:
+        return None
+    function_code = frame[1]
+    if function_code & 0x80:   # exception response: addr + func + exception code + CRC
+        return 5
+    if function_code in (cst.READ_HOLDING_REGISTERS, cst.READ_INPUT_REGISTERS):
+        if len(frame) < 3:   # the byte count field is not received yet
+            return None
+        return 5 + frame[2]   # addr + func + byte count + payload + CRC
+    return 8   # the write responses echo addr + func + reg + value/quantity + CRC
+
+
+class _DFRobot_RtuMaster(modbus_rtu.RtuMaster):
+    '''!
+      @brief RtuMaster with a deadline based receive loop
+      @details pyserial read(n) can return after the full timeout with fewer bytes than
+      @n       requested, so one lost byte stalls every transaction for the whole timeout,
+      @n       and a slow long response can be cut off while bytes are still arriving.
+      @n       Receive instead with select() against one deadline and return as soon as
+      @n       the RTU frame length field indicates the response is complete.
+    '''
+
+    def set_timeout(self, timeout_in_sec, use_sw_timeout=False):
+        '''!
+          @brief Set the response deadline, keep the serial port itself non-blocking
+          @param timeout_in_sec the whole response deadline, unit second
+          @param use_sw_timeout unused, kept for interface compatibility
+        '''
+        modbus_rtu.Master.set_timeout(self, timeout_in_sec)
+        self._serial.timeout = 0
+        self.use_sw_timeout = use_sw_timeout
+
+    def _recv(self, expected_length=-1):
+        '''!
+          @brief Receive the response from the slave before the deadline
+          @param expected_length unused, the length is taken from the frame itself
+          @return the received response frame, possibly incomplete on timeout
+        '''
+        response = bytearray()
+        deadline = time.monotonic() + self.get_timeout()
+        while True:
+            frame_length = _rtu_frame_length(response)
+            if (frame_length is not None) and (len(response) >= frame_length):
+                break
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            ready, _, _ = select.select([self._serial], [], [], remaining)
+            if not ready:
+                break
+            response += self._serial.read(self._serial.in_waiting or 1)
+
+        retval = call_hooks("modbus_rtu.RtuMaster.after_recv", (self, response))
+        if retval is not None:
+            return retval
+        return bytes(response)
+
+
+## shared RtuMaster instances keyed by serial port settings; two handles to one
+## RS-485 bus would race on writes and corrupt the RTU framing, so every module
+## on the same port must go through the same master
+_RTU_CACHE = {}
+
+
+def _get_rtu_master(port, baud, bytesize, parity, stopbit, xonxoff):
+    '''!
+      @brief Get or create the shared RtuMaster of one serial port configuration
+      @param port modbus communication serial port
+      @param baud modbus communication baud rate
+      @param bytesize modbus communication byte size
+      @param parity modbus communication check bit
+      @param stopbit modbus communication stop bit
+      @param xonxoff modbus communication synchronous and asynchronous setting
+      @return the shared _DFRobot_RtuMaster for these settings
+    '''
+    key = (port, baud, bytesize, parity, stopbit, xonxoff)
+    master = _RTU_CACHE.get(key)
+    if master is None:
+        rs01_serial = serial.Serial(port, baud, bytesize, parity, stopbit, xonxoff)
+        _set_low_latency(rs01_serial)
+        master = _DFRobot_RtuMaster(rs01_serial)
+        master.set_timeout(0.5)
+        master._rs01_lock = threading.Lock()   # serializes transactions across instances
+        _RTU_CACHE[key] = master
+    return master
+
 
 class DFRobot_RS01(object):
     '''!
@@ -94,6 +267,11 @@ class DFRobot_RS01(object):
       @details to drive RS01 radar
     '''
 
+    ## fixed instance attribute slots, instances carry no per-object __dict__
+    __slots__ = ('_rs01_addr', '_DFRobot_RTU', 'reg_value_buf',
+                 '_all_reg_buf', '_all_reg_time', '_all_reg_request',
+                 '_bg_thread', '_bg_stop', '_ring', '_ring_write')
+
     ## baud rate 2400
     E_BAUDRATE_2400 = 0x0001
     ## baud rate 4800
@@ -123,7 +301,7 @@ class DFRobot_RS01(object):
     ## stop bit 2bit
     E_STOPBIT_2 = 0x0003
 
-    def __init__(self, addr, port="/dev/ttyAMA0", baud = 115200, bytesize = 8, parity = 'N', stopbit = 1, xonxoff=0):
+    def __init__(self, addr, port="/dev/ttyAMA0", baud = 115200, bytesize = 8, parity = 'N', stopbit = 1, xonxoff=0, verbose=False, master=None):
         '''!
           @brief Module RTU communication init
           @param addr modbus communication address
@@ -133,43 +311,51 @@ class DFRobot_RS01(object):
           @param parity modbus communication check bit
           @param stopbit modbus communication stop bit
           @param xonxoff modbus communication synchronous and asynchronous setting
+          @param verbose True makes modbus_tk trace every request and response,
+          @n     off by default since the hexdump is formatted even when discarded
+          @param master an already constructed modbus_rtu.RtuMaster to use instead of
+          @n     opening the port, modules with different addr on one bus automatically
+          @n     share one master either way
         '''
         self._rs01_addr = addr
 
-        self._DFRobot_RTU = modbus_rtu.RtuMaster(
-            serial.Serial(port, baud, bytesize, parity, stopbit, xonxoff)
-        )
-        self._DFRobot_RTU.set_timeout(0.5)
-        self._DFRobot_RTU.set_verbose(True)
-        self.reg_value_buf = [0, 0, 0, 0, 0, 0]
-        self.reg_value_buf[0] = 0x00C8   # the default measurement start position 200
-        self.reg_value_buf[1] = 0x1770   # the default measurement stop position 6000
-        self.reg_value_buf[2] = 0x0190   # the default initial threshold 400
-        self.reg_value_buf[3] = 0x0190   # the default end threshold 400
-        self.reg_value_buf[4] = 0x0002   # the default measurement sensitivity 2
-        self.reg_value_buf[5] = 0x0000   # the default comparison offset 0
-
-    def begin(self):
+        if master is None:
+            master = _get_rtu_master(port, baud, bytesize, parity, stopbit, xonxoff)
+        elif not hasattr(master, '_rs01_lock'):
+            master._rs01_lock = threading.Lock()
+        self._DFRobot_RTU = master
+        self._DFRobot_RTU.set_verbose(verbose)
+        self.reg_value_buf = list(_DEFAULT_CFG)
+        self._all_reg_buf = ()
+        self._all_reg_time = 0.0
+        self._all_reg_request = _build_read_request(addr, RS01_PID_REG, RS01_ALL_REG_NUMBER)
+        self._bg_thread = None
+        self._bg_stop = None
+        self._ring = []
+        self._ring_write = 0
+
+    def begin(self, startup_delay=0):
         '''!
           @brief Init sensor
+          @param startup_delay time to wait for the module power-up, unit second,
+          @n     most modules are ready well before 1 s so the default is no wait
           @return  return initialization status
           @retval True indicate initialization succeed
           @retval False indicate initialization failed
         '''
-        time.sleep(1)
-        ret = True
-        if(self._rs01_addr >0xF7) and (self._rs01_addr < 1):
-            ret = False
-
-        if RS01_PID != self._read_reg(RS01_PID_REG, 1)[0]:
-            ret = False
-
-        return ret
+        if startup_delay:
+            time.sleep(startup_delay)
+        if (self._rs01_addr < 1) or (self._rs01_addr > 0xF7):
+            return False
+        try:
+            return RS01_PID == self._read_all()[0]
+        except Exception:
+            return False
 
     def read_basic_info(self):
         '''!
           @brief Read the device basic information
-          @return list: 
+          @return tuple: 
           @retval  the first element: module PID
           @retval  the second element: module VID
           @retval  the third element: the module communication address
@@ -177,12 +363,15 @@ class DFRobot_RS01(object):
           @retval  the fifth element: the module check bit and stop bit
           @retval  the sixth element: firmware version number
         '''
-        return self._read_reg(RS01_PID_REG, 6)
+        return self._read_all()[RS01_PID_REG:RS01_TARGETS_NUMBER]
 
-    def read_measurement_data(self):
+    def read_measurement_data(self, nonblocking=False):
         '''!
           @brief Read the measured data from the module
-          @return list: 
+          @param nonblocking True returns the latest sample collected by the background
+          @n     thread without touching the bus, so the caller never waits for the
+          @n     serial turnaround, requires start_background() to be running
+          @return tuple:
           @retval  the first element: the number of objects currently detected
           @retval  the second element: measured distance to the first object; the third element: measured intensity of the first object
           @retval  the fourth element: measured distance to the second object; the fifth element: measured intensity of the second object
@@ -190,12 +379,67 @@ class DFRobot_RS01(object):
           @retval  the eighth element: measured distance to the fourth object; the ninth element: measured intensity of the fourth object
           @retval  the tenth element: measured distance to the fifth object; the eleventh element: measured intensity of the fifth object
         '''
-        return self._read_reg(RS01_TARGETS_NUMBER, 11)
+        if nonblocking:
+            if 0 == self._ring_write:   # no sample collected yet
+                return ()
+            return self._ring[(self._ring_write - 1) % len(self._ring)][1]
+        return self._read_all()[RS01_TARGETS_NUMBER:MEASUREMENT_START_POSITION]
+
+    def start_background(self, hz=50, depth=16):
+        '''!
+          @brief Start a daemon thread that keeps polling the measured data
+          @details The thread fills a fixed-size ring of (monotonic timestamp, data)
+          @n       samples, latest wins, so read_measurement_data(nonblocking=True)
+          @n       costs one list index instead of a serial round-trip
+          @param hz background polling frequency, unit Hz
+          @param depth the number of samples kept in the ring
+        '''
+        if self._bg_thread is not None:
+            return
+        self._ring = [(0.0, ())] * depth
+        self._ring_write = 0
+        self._bg_stop = threading.Event()
+        self._bg_thread = threading.Thread(target=self._background_poll, args=(1.0 / hz, depth))
+        self._bg_thread.daemon = True
+        self._bg_thread.start()
+
+    def stop_background(self):
+        '''!
+          @brief Stop the background polling thread, the last samples stay readable
+        '''
+        if self._bg_thread is None:
+            return
+        self._bg_stop.set()
+        self._bg_thread.join()
+        self._bg_thread = None
+        self._bg_stop = None
+
+    def _background_poll(self, period, depth):
+        '''!
+          @brief Body of the background polling thread
+          @param period time between two polls, unit second
+          @param depth the number of samples kept in the ring
+        '''
+        next_tick = time.monotonic()
+        while not self._bg_stop.is_set():
+            try:
+                # transact directly so the TTL cache never caps the sampling rate,
+                # and refresh the cache so foreground readers share the sample
+                regs = self._transact_read_all()
+                self._all_reg_buf = regs
+                self._all_reg_time = time.monotonic()
+                data = regs[RS01_TARGETS_NUMBER:MEASUREMENT_START_POSITION]
+                self._ring[self._ring_write % depth] = (time.monotonic(), data)
+                self._ring_write += 1
+            except Exception:
+                pass   # keep polling, the ring simply misses one sample
+            next_tick += period
+            self._bg_stop.wait(max(0, next_tick - time.monotonic()))
 
     def read_measurement_config(self):
         '''!
           @brief read the module measurement parameters currently configured
-          @return list: 
+          @return tuple: 
           @retval  the first element: current measurement start position set value 
           @retval  the second element: current measurement stop position set value
           @retval  the third element: current initial threshold set value
@@ -203,18 +447,21 @@ class DFRobot_RS01(object):
           @retval  the fifth element: current module sensitivity set value
           @retval  the sixth element: current comparison offset set value
         '''
-        return self._read_reg(MEASUREMENT_START_POSITION, 6)
+        return self._read_all()[MEASUREMENT_START_POSITION:RS01_ALL_REG_NUMBER]
 
     def set_ADDR(self, addr):
         '''!
           @brief Set the module communication address
           @param addr Device address to be set, (1~247 is 0x0001~0x00F7)
+          @n     an address out of that range raises ValueError instead of silently doing nothing
         '''
-        if 0x0001 < addr < 0x00F7:
-            if 0 != len(self._write_reg(RS01_ADDR_REG, [addr])):
-                self._rs01_addr = addr
-            else:
-                logger.info("Set addr failed!")
+        if not (0x0001 <= addr <= 0x00F7):
+            raise ValueError("Modbus addr must be 1~247")
+        if 0 != len(self._write_reg(RS01_ADDR_REG, [addr])):
+            self._rs01_addr = addr
+            self._all_reg_request = _build_read_request(addr, RS01_PID_REG, RS01_ALL_REG_NUMBER)
+        else:
+            logger.info("Set addr failed!")
 
     def set_baudrate_mode(self, mode):
         '''!
@@ -224,11 +471,26 @@ class DFRobot_RS01(object):
           @n     E_BAUDRATE_14400---14400, E_BAUDRATE_19200---19200, E_BAUDRATE_38400---38400, 
           @n     E_BAUDRATE_57600---57600, E_BAUDRATE_115200---115200
         '''
+        if not (self.E_BAUDRATE_2400 <= mode <= self.E_BAUDRATE_115200):
+            raise ValueError("baud rate mode must be one of the E_BAUDRATE_* values")
         if 0 != len(self._write_reg(RS01_BAUDRATE_REG, [mode])):
-            time.sleep(0.5)
+            time.sleep(0.1)   # allow both UARTs to reconfigure, no read-back at the old rate
         else:
             logger.info("Set baudrate failed!")
 
+    def set_baudrate(self, hz):
+        '''!
+          @brief Set the module baud rate from the plain rate in Hz
+          @details Convenience wrapper around set_baudrate_mode for callers that
+          @n       have the rate itself rather than an E_BAUDRATE_* mode value
+          @param hz the baud rate: 2400, 4800, 9600, 14400, 19200, 38400, 57600 or 115200
+        '''
+        try:
+            mode = _BAUD_TABLE[hz]
+        except KeyError:
+            raise ValueError("unsupported baud rate: %s" % hz)
+        self.set_baudrate_mode(mode)
+
     def set_checkbit_stopbit(self, mode):
         '''!
           @brief Set check bit and stop bit of the module
@@ -241,9 +503,32 @@ class DFRobot_RS01(object):
           @n          E_STOPBIT_1
           @n          E_STOPBIT_2
         '''
+        if ((mode & 0xFF00) not in (self.E_CHECKBIT_NONE, self.E_CHECKBIT_EVEN, self.E_CHECKBIT_ODD)) \
+                or ((mode & 0x00FF) not in (self.E_STOPBIT_1, self.E_STOPBIT_2)):
+            raise ValueError("mode must be the OR of one E_CHECKBIT_* and one E_STOPBIT_* value")
         if 0 == len(self._write_reg(RS01_CHECKBIT_STOPBIT_REG, [mode])):
             logger.info("Set checkbit and stopbit failed!")
 
+    def set_uart_config(self, baud_mode, checkbit_stopbit_mode):
+        '''!
+          @brief Set the module baud rate, check bit and stop bit in one transaction
+          @details The two config registers are adjacent, so writing both in one request
+          @n       halves the turnaround compared to calling set_baudrate_mode and
+          @n       set_checkbit_stopbit separately, preferred when reconfiguring the port.
+          @n       Power off to save the settings, and restart for the settings to take effect
+          @param baud_mode The baud rate to be set, one of E_BAUDRATE_*
+          @param checkbit_stopbit_mode perform OR operation on one E_CHECKBIT_* and one E_STOPBIT_*
+        '''
+        if not (self.E_BAUDRATE_2400 <= baud_mode <= self.E_BAUDRATE_115200):
+            raise ValueError("baud rate mode must be one of the E_BAUDRATE_* values")
+        if ((checkbit_stopbit_mode & 0xFF00) not in (self.E_CHECKBIT_NONE, self.E_CHECKBIT_EVEN, self.E_CHECKBIT_ODD)) \
+                or ((checkbit_stopbit_mode & 0x00FF) not in (self.E_STOPBIT_1, self.E_STOPBIT_2)):
+            raise ValueError("mode must be the OR of one E_CHECKBIT_* and one E_STOPBIT_* value")
+        if 0 != len(self._write_reg(RS01_BAUDRATE_REG, [baud_mode, checkbit_stopbit_mode])):
+            time.sleep(0.1)   # allow both UARTs to reconfigure, no read-back at the old rate
+        else:
+            logger.info("Set uart config failed!")
+
     def set_all_measurement_parameters(self, starting_position, stop_position, 
                                         initial_threshold, end_threshold,
                                         module_sensitivity, comparison_offset):
@@ -251,41 +536,82 @@ class DFRobot_RS01(object):
           @brief configure the value at measurement start position, configure the value at measurement stop position, 
           @n     configure the initial threshold, configure the end threshold, 
           @n     configure the module sensitivity, configure the comparison offset
-          @param starting_position value at start position, 0x0046~0x19C8
+          @param starting_position value at start position, 0x0046~0x19C8, can't be greater than stop_position
           @param stop_position value at stop position, 0x0046~0x19C8
           @param initial_threshold initial threshold, 0x0064~0x2710
           @param end_threshold end threshold, 0x0064~0x2710
           @param module_sensitivity module sensitivity, 0x0000~0x0004
-          @param comparison_offset comparison offset, 0x0000~0xFFFF
+          @param comparison_offset comparison offset, -32768~32767
+          @n     If any parameter is out of range, ValueError is raised and nothing is
+          @n     written, so the module never receives a mix of new and old values
         '''
-        self.reg_value_buf = self._read_reg(MEASUREMENT_START_POSITION, 6)
-        if 0 == len(self.reg_value_buf):
-            logger.info("read all measurement parameters failed!")
-        else:
-            if 0x0046 <= starting_position <= self.reg_value_buf[1]:
-                self.reg_value_buf[0] = starting_position
-            if self.reg_value_buf[0] <= stop_position <= 0x19C8:
-                self.reg_value_buf[1] = stop_position
-            if 0x0064 <= initial_threshold <= 0x2710 and 0 < initial_threshold + self.reg_value_buf[5]:
-                self.reg_value_buf[2] = initial_threshold
-            if 0x0064 <= end_threshold <= 0x2710 and 0 < end_threshold + self.reg_value_buf[5]:
-                self.reg_value_buf[3] = end_threshold
-            if 0x0000 <= module_sensitivity <= 0x0004:
-                self.reg_value_buf[4] = module_sensitivity
-            if (0 < self.reg_value_buf[2] + comparison_offset) and (0 < comparison_offset + self.reg_value_buf[3]):
-                self.reg_value_buf[5] = comparison_offset
-
-            if 0 == len(self._write_reg(MEASUREMENT_START_POSITION, self.reg_value_buf)):
-                logger.info("set all measurement parameters failed!")
-            time.sleep(1)
+        vals = (starting_position, stop_position, initial_threshold,
+                end_threshold, module_sensitivity, comparison_offset)
+        spec = ((0x0046, 0x19C8), (0x0046, 0x19C8), (0x0064, 0x2710),
+                (0x0064, 0x2710), (0x0000, 0x0004), (-0x8000, 0x7FFF))
+        if not all(low <= value <= high for value, (low, high) in zip(vals, spec)) \
+                or (starting_position > stop_position) \
+                or (0 >= initial_threshold + comparison_offset) \
+                or (0 >= end_threshold + comparison_offset):
+            raise ValueError("invalid measurement parameters, nothing is written")
+        self.reg_value_buf = list(vals)
+        self.reg_value_buf[5] &= 0xFFFF   # the offset is sent as an unsigned 16-bit word
+        if 0 == len(self._write_reg(MEASUREMENT_START_POSITION, self.reg_value_buf)):
+            logger.info("set all measurement parameters failed!")
+            return
+        # return as soon as the module reports the new settings rather than
+        # always blocking for the worst-case settling time
+        expected = tuple(self.reg_value_buf)
+        deadline = time.monotonic() + 1.0
+        while time.monotonic() < deadline:
+            try:
+                if expected == tuple(self._read_reg(MEASUREMENT_START_POSITION, 6)):
+                    return
+            except Exception:
+                pass
+            time.sleep(0.02)
 
     def restore_factory_setting(self):
         '''!
           @brief Restore to factory setting
         '''
-        if 0 != self._write_reg(RS01_RESET_FACTORY, 0x0000):
+        if not self._write_single(RS01_RESET_FACTORY, 0x0000):
             logger.info("restore factory setting failed!")
 
+    def _read_all(self):
+        '''!
+          @brief Read all the module holding registers in one transaction
+          @n     The read result is cached briefly, so the read interfaces called
+          @n     back to back in one polling cycle share a single serial transaction
+          @return tuple: The values of the 23 holding registers.
+        '''
+        if (time.monotonic() - self._all_reg_time) >= RS01_CACHE_TTL:
+            self._all_reg_buf = self._transact_read_all()
+            self._all_reg_time = time.monotonic()
+        return self._all_reg_buf
+
+    def _transact_read_all(self):
+        '''!
+          @brief Send the precomputed all-register request and parse the response in place
+          @details Writes the frame built in __init__ straight to the serial port and
+          @n       unpacks the payload directly, bypassing modbus_tk's per-call request
+          @n       encoding on the polling hot path
+          @return tuple: The values of the 23 holding registers.
+        '''
+        with self._DFRobot_RTU._rs01_lock:
+            self._DFRobot_RTU.open()
+            rs01_serial = self._DFRobot_RTU._serial
+            rs01_serial.reset_input_buffer()
+            rs01_serial.write(self._all_reg_request)
+            rs01_serial.flush()
+            frame = self._DFRobot_RTU._recv()
+        if (len(frame) != 5 + 2 * RS01_ALL_REG_NUMBER) or (frame[0] != self._rs01_addr) \
+                or (frame[1] != cst.READ_HOLDING_REGISTERS):
+            raise ModbusInvalidResponseError("Invalid all-register response frame")
+        if struct.unpack(">H", frame[-2:])[0] != _calculate_crc16(frame[:-2]):
+            raise ModbusInvalidResponseError("Invalid CRC in response")
+        return _ALL_REG_STRUCT.unpack_from(frame, 3)
+
     def _write_reg(self, reg, data):
         '''!
           @brief writes data to a register
@@ -296,16 +622,40 @@ class DFRobot_RS01(object):
         # Low level register writing, not implemented in base class
         if isinstance(data, int):
             data = [data]
-        ret = self._DFRobot_RTU.execute(self._rs01_addr, cst.WRITE_MULTIPLE_REGISTERS, reg, output_value=data)
-        logger.info(ret)
+        with self._DFRobot_RTU._rs01_lock:
+            ret = self._DFRobot_RTU.execute(self._rs01_addr, cst.WRITE_MULTIPLE_REGISTERS, reg, output_value=data)
+        self._all_reg_time = 0.0   # the cached registers are stale after a write
+        if logger.isEnabledFor(logging.INFO):   # skip stringifying the tuple when silenced
+            logger.info("%r", ret)
         return ret
 
+    def _write_single(self, reg, val):
+        '''!
+          @brief write one register with the WRITE_SINGLE_REGISTER function code
+          @details Some modbus slaves reject a multi-register write of length 1,
+          @n       and the single-register request is one word shorter on the wire
+          @param reg register address
+                 val written value
+          @return True if the module echoed the write, False otherwise
+        '''
+        try:
+            with self._DFRobot_RTU._rs01_lock:
+                ret = self._DFRobot_RTU.execute(self._rs01_addr, cst.WRITE_SINGLE_REGISTER, reg, output_value=val)
+        except Exception:
+            return False
+        self._all_reg_time = 0.0   # the cached registers are stale after a write
+        if logger.isEnabledFor(logging.INFO):   # skip stringifying the tuple when silenced
+            logger.info("%r", ret)
+        return ret == (reg, val & 0xFFFF)
+
     def _read_reg(self, reg, length):
         '''!
           @brief read the data from the register
           @param reg register address
                  length read data length
-          @return list: The value list of the holding register.
+          @return tuple: The values of the holding register, returned as modbus_tk
+          @n      parsed them without an extra copy, indexing and len() are unchanged.
         '''
         # Low level register writing, not implemented in base class
-        return list(self._DFRobot_RTU.execute(self._rs01_addr, cst.READ_HOLDING_REGISTERS, reg, length))
+        with self._DFRobot_RTU._rs01_lock:
+            return self._DFRobot_RTU.execute(self._rs01_addr, cst.READ_HOLDING_REGISTERS, reg, length)